@@ -5,12 +5,14 @@ GitHub Pages用の株式ダッシュボードHTMLを生成する
 Usage:
     python generate_site.py
     python generate_site.py --password YOUR_PASSWORD
+    python generate_site.py --alert-sink file:alerts.log --alert-sink stdout
 """
 
 import os
 import sys
 import json
 import hashlib
+import urllib.request
 from datetime import datetime
 from pathlib import Path
 
@@ -248,6 +250,163 @@ def analyze_stocks():
     return results
 
 
+class TrendJournal:
+    """銘柄ごとの trend_type / スコアを追記専用で記録するジャーナル
+
+    ジャーナル本体 (JSONL) には状態が変わった銘柄だけを追記し、
+    各銘柄の最新状態は状態ファイルにインデックスとして保存する。
+    状態ファイルにはジャーナルの読込済みバイト位置も持たせ、
+    起動時は未反映の末尾だけを読み直すので履歴が伸びてもコストは増えない。
+    """
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self.state_path = self.path.with_suffix('.state.json')
+        self.latest = {}
+        self._offset = 0
+        self._load()
+
+    def _load(self):
+        if self.state_path.exists():
+            try:
+                state = json.loads(self.state_path.read_text(encoding='utf-8'))
+                self.latest = state.get('symbols', {})
+                self._offset = state.get('offset', 0)
+            except (ValueError, OSError):
+                self.latest = {}
+                self._offset = 0
+
+        if not self.path.exists():
+            self.latest = {}
+            self._offset = 0
+            return
+
+        # 状態ファイルより後ろに追記された分だけを反映
+        if self.path.stat().st_size < self._offset:
+            self.latest = {}
+            self._offset = 0
+        with self.path.open('rb') as f:
+            f.seek(self._offset)
+            for line in f:
+                if not line.endswith(b'\n'):
+                    break
+                self._offset += len(line)
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    continue
+                self.latest[entry['symbol']] = entry
+
+    def record(self, results):
+        """分析結果を記録し、trend_type が変化した銘柄の遷移リストを返す"""
+        date = datetime.now().isoformat(timespec='seconds')
+        entries = []
+        transitions = []
+
+        for r in results:
+            prev = self.latest.get(r['symbol'])
+            if prev and prev['trend_type'] == r['trend_type'] and prev['score'] == r['score']:
+                continue
+
+            entry = {
+                'date': date,
+                'symbol': r['symbol'],
+                'trend_type': r['trend_type'],
+                'score': r['score'],
+            }
+            entries.append(entry)
+
+            if prev and prev['trend_type'] != r['trend_type']:
+                transitions.append({
+                    'symbol': r['symbol'],
+                    'name': r['name'],
+                    'prev_trend_type': prev['trend_type'],
+                    'trend_type': r['trend_type'],
+                    'prev_score': prev['score'],
+                    'score': r['score'],
+                    'date': date,
+                })
+
+        if entries:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            data = ''.join(json.dumps(e, ensure_ascii=False) + '\n' for e in entries)
+            with self.path.open('ab') as f:
+                f.write(data.encode('utf-8'))
+                self._offset = f.tell()
+            for e in entries:
+                self.latest[e['symbol']] = e
+            self._save_state()
+
+        return transitions
+
+    def _save_state(self):
+        state = {'offset': self._offset, 'symbols': self.latest}
+        tmp_path = self.state_path.with_suffix('.tmp')
+        tmp_path.write_text(json.dumps(state, ensure_ascii=False), encoding='utf-8')
+        os.replace(tmp_path, self.state_path)
+
+
+def format_transition(t):
+    """遷移を1行のメッセージに整形"""
+    prev_label = get_trend_display(t['prev_trend_type'])['label']
+    label = get_trend_display(t['trend_type'])['label']
+    return (f"{t['symbol']} ({t['name']}) {prev_label} → {label} "
+            f"(スコア {t['prev_score']} → {t['score']})")
+
+
+class StdoutAlertSink:
+    """遷移アラートを標準出力に表示"""
+
+    def send(self, transitions):
+        print(f"\n!! トレンド変化:")
+        for t in transitions:
+            print(f"   {format_transition(t)}")
+
+
+class FileAlertSink:
+    """遷移アラートをファイルに追記"""
+
+    def __init__(self, path):
+        self.path = Path(path)
+
+    def send(self, transitions):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with self.path.open('a', encoding='utf-8') as f:
+            for t in transitions:
+                f.write(f"{t['date']} {format_transition(t)}\n")
+
+
+class WebhookAlertSink:
+    """遷移アラートを JSON で Webhook に POST"""
+
+    def __init__(self, url, timeout=10):
+        self.url = url
+        self.timeout = timeout
+
+    def send(self, transitions):
+        body = json.dumps({'transitions': transitions}, ensure_ascii=False).encode('utf-8')
+        req = urllib.request.Request(
+            self.url, data=body, headers={'Content-Type': 'application/json'}, method='POST'
+        )
+        try:
+            with urllib.request.urlopen(req, timeout=self.timeout):
+                pass
+        except OSError as e:
+            print(f"  エラー: Webhook送信失敗 - {e}")
+
+
+def create_alert_sink(spec):
+    """'stdout' / 'file:PATH' / 'webhook:URL' 形式の指定からシンクを生成"""
+    kind, _, target = spec.partition(':')
+    if kind == 'stdout':
+        return StdoutAlertSink()
+    if kind == 'file' and target:
+        return FileAlertSink(target)
+    if kind == 'webhook' and target:
+        return WebhookAlertSink(target)
+    raise ValueError(f"不明なアラート出力先: {spec}")
+
+
 def get_trend_display(trend_type):
     """トレンドタイプの表示情報を取得"""
     displays = {
@@ -260,8 +419,11 @@ def get_trend_display(trend_type):
     return displays.get(trend_type, displays['UNKNOWN'])
 
 
-def generate_html(results, password_hash=None):
-    """HTMLを生成"""
+def generate_html(results, password_hash=None, transitions=None):
+    """HTMLを生成
+
+    transitions が渡された場合、アラートは前回から状態が変化した銘柄のみ表示する
+    """
     now = datetime.now().strftime('%Y.%m.%d %H:%M')
 
     # 売却シグナル（下降トレンド）
@@ -277,7 +439,16 @@ def generate_html(results, password_hash=None):
 
     # アラートメッセージ
     alert_html = ""
-    if sell_signals:
+    if transitions is not None:
+        if transitions:
+            names = " / ".join([
+                f"<strong>{t['symbol']} {t['name']}</strong> "
+                f"{get_trend_display(t['prev_trend_type'])['label']} → "
+                f"{get_trend_display(t['trend_type'])['label']}"
+                for t in transitions
+            ])
+            alert_html = f'<div class="alert">{names} — トレンド変化</div>'
+    elif sell_signals:
         names = " / ".join([f"<strong>{r['symbol']} {r['name']}</strong>" for r in sell_signals])
         alert_html = f'<div class="alert">{names} — 下降トレンド、売却シグナル</div>'
     elif sell_candidates:
@@ -625,6 +796,10 @@ def main():
     parser = argparse.ArgumentParser()
     parser.add_argument('--password', help='認証用パスワード')
     parser.add_argument('--output', default='index.html', help='出力ファイル名')
+    parser.add_argument('--journal', default='trend_journal.jsonl', help='トレンド履歴ジャーナル')
+    parser.add_argument('--no-journal', action='store_true', help='ジャーナルを使わず現在の状態のみ表示')
+    parser.add_argument('--alert-sink', action='append', default=[],
+                        help='トレンド変化の通知先 (stdout / file:PATH / webhook:URL、複数指定可)')
     args = parser.parse_args()
 
     print("株式ダッシュボード生成中...")
@@ -641,7 +816,22 @@ def main():
         password_hash = hashlib.sha256(args.password.encode()).hexdigest()
         print(f"\nパスワード保護を有効化")
 
-    html = generate_html(results, password_hash)
+    try:
+        sinks = [create_alert_sink(spec) for spec in args.alert_sink]
+    except ValueError as e:
+        print(f"エラー: {e}")
+        sys.exit(1)
+
+    transitions = None
+    if not args.no_journal:
+        journal = TrendJournal(args.journal)
+        first_run = not journal.latest
+        transitions = journal.record(results)
+        if first_run:
+            # 比較対象がない初回は従来どおり現在の状態でアラートを表示
+            transitions = None
+
+    html = generate_html(results, password_hash, transitions)
 
     output_path = Path(args.output)
     output_path.write_text(html, encoding='utf-8')
@@ -663,6 +853,11 @@ def main():
         for s in sell_candidates:
             print(f"   {s['symbol']} ({s['name']}) - スコア {s['score']}")
 
+    # トレンド変化の通知
+    if transitions:
+        for sink in sinks:
+            sink.send(transitions)
+
 
 if __name__ == "__main__":
     main()